@@ -1,3 +1,5 @@
+import asyncio
+import collections
 import datetime
 import json
 import logging
@@ -5,13 +7,22 @@ import platform
 import re
 import socket
 import sys
+import time
 import traceback
+import weakref
 from enum import Enum
-from threading import Lock, Timer
+from threading import Condition, Lock, Thread, current_thread, local
 from typing import Any, Dict, Iterable, Optional, TextIO
 
 from elasticsearch import Elasticsearch, RequestsHttpConnection, helpers as eshelpers
 
+try:
+    from elasticsearch import AsyncElasticsearch
+
+    ASYNC_TRANSPORT_SUPPORTED = True
+except ImportError:
+    ASYNC_TRANSPORT_SUPPORTED = False
+
 try:
     from requests_kerberos import HTTPKerberosAuth, DISABLED
 
@@ -28,6 +39,53 @@ except ImportError:
 
 from eslogging.serializers import ESSerializer
 
+_HOST = None
+_HOST_IP = None
+_HOST_LOCK = Lock()
+
+# Handlers with an identical connection configuration share one client (and thus one
+#       TCP connection pool); weak values let a client die with its last handler
+_CLIENT_CACHE = weakref.WeakValueDictionary()
+
+# LogRecord fields that carry no value for the indexed document
+_EMIT_SKIP_FIELDS = frozenset(('msecs',
+                               'relativeCreated',
+                               'levelno',
+                               'created',
+                               'args'))
+
+# LogRecord has a fixed schema, captured once here so emit() can copy the interesting
+#       fields without a per-key membership test; only `extra=` fields need the slow path
+_LOGRECORD_SCHEMA = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None)))
+_LOGRECORD_COPY_KEYS = tuple(sorted(_LOGRECORD_SCHEMA - _EMIT_SKIP_FIELDS))
+_LOGRECORD_SCHEMA_LEN = len(_LOGRECORD_SCHEMA)
+
+
+def _resolve_host():
+    """ Resolves and caches the local host name and IP once per process
+
+    gethostbyname can block on slow DNS, so the result is shared by every
+    handler instance instead of being recomputed per construction.
+    """
+    global _HOST, _HOST_IP
+    if _HOST is None:
+        with _HOST_LOCK:
+            if _HOST is None:
+                host = socket.gethostname()
+                if platform.system() != 'Darwin':
+                    try:
+                        host_ip = socket.gethostbyname(host)
+                    except Exception as err:
+                        if err.errno == 8:
+                            host_ip = '127.0.0.1'
+                        else:
+                            raise err
+                else:
+                    host_ip = '127.0.0.1'
+                _HOST_IP = host_ip
+                _HOST = host
+    return _HOST, _HOST_IP
+
 
 class ESHandler(logging.Handler):
     """ Elasticsearch log handler
@@ -78,18 +136,23 @@ class ESHandler(logging.Handler):
     __DEFAULT_ES_DOC_TYPE = 'python_log'
     __DEFAULT_RAISE_ON_EXCEPTION = False
     __DEFAULT_TIMESTAMP_FIELD_NAME = "timestamp"
+    __DEFAULT_MAX_INFLIGHT_BULKS = 8
+    __DEFAULT_LOCAL_BUFFER_SIZE = 0
 
-    __LOGGING_FILTER_FIELDS = ['msecs',
-                               'relativeCreated',
-                               'levelno',
-                               'created']
+    __LOGGING_FILTER_FIELDS = _EMIT_SKIP_FIELDS
 
+    # Kept only as a fallback for users who monkey-patch the filter; es_filter itself
+    #       uses the C-level substring probes below, which are strictly faster per record
     BASE_ES_MODULE_FILTER_RE = re.compile(r'.+elasticsearch[\\/]connection[\\/]base.py.*$', re.I)
 
+    _ES_PATH_NEEDLES = ('elasticsearch/connection/base.py',
+                        'elasticsearch\\connection\\base.py')
+
     @classmethod
     def es_filter(cls, record: logging.LogRecord) -> bool:
         """Filters out records coming from Elasticsearch base module"""
-        return not cls.BASE_ES_MODULE_FILTER_RE.match(record.pathname)
+        pathname = record.pathname
+        return not any(needle in pathname for needle in cls._ES_PATH_NEEDLES)
 
     @staticmethod
     def _get_daily_index_name(es_index_name: str) -> str:
@@ -97,7 +160,8 @@ class ESHandler(logging.Handler):
         :param: index_name the prefix to be used in the index
         :return: A srting containing the elasticsearch indexname used which should include the date.
         """
-        return "{0!s}-{1!s}".format(es_index_name, datetime.datetime.now().strftime('%Y.%m.%d'))
+        t = time.gmtime()
+        return f"{es_index_name}-{t.tm_year:04d}.{t.tm_mon:02d}.{t.tm_mday:02d}"
 
     @staticmethod
     def _get_weekly_index_name(es_index_name: str) -> str:
@@ -105,9 +169,9 @@ class ESHandler(logging.Handler):
         :param: index_name the prefix to be used in the index
         :return: A srting containing the elasticsearch indexname used which should include the date and specific week
         """
-        current_date = datetime.datetime.now()
-        start_of_the_week = current_date - datetime.timedelta(days=current_date.weekday())
-        return "{0!s}-{1!s}".format(es_index_name, start_of_the_week.strftime('%Y.%m.%d'))
+        now = time.time()
+        t = time.gmtime(now - time.gmtime(now).tm_wday * 86400)
+        return f"{es_index_name}-{t.tm_year:04d}.{t.tm_mon:02d}.{t.tm_mday:02d}"
 
     @staticmethod
     def _get_monthly_index_name(es_index_name: str) -> str:
@@ -115,7 +179,8 @@ class ESHandler(logging.Handler):
         :param: index_name the prefix to be used in the index
         :return: A srting containing the elasticsearch indexname used which should include the date and specific moth
         """
-        return "{0!s}-{1!s}".format(es_index_name, datetime.datetime.now().strftime('%Y.%m'))
+        t = time.gmtime()
+        return f"{es_index_name}-{t.tm_year:04d}.{t.tm_mon:02d}"
 
     @staticmethod
     def _get_unchanged_index_name(es_index_name: str) -> str:
@@ -131,7 +196,8 @@ class ESHandler(logging.Handler):
         :param: index_name the prefix to be used in the index
         :return: A srting containing the elasticsearch indexname used which should include the date and specific year
         """
-        return "{0!s}-{1!s}".format(es_index_name, datetime.datetime.now().strftime('%Y'))
+        t = time.gmtime()
+        return f"{es_index_name}-{t.tm_year:04d}"
 
     _INDEX_FREQUENCY_FUNCION_DICT = {
         IndexNameFrequency.NO_FREQ: _get_unchanged_index_name,
@@ -141,6 +207,26 @@ class ESHandler(logging.Handler):
         IndexNameFrequency.YEARLY: _get_yearly_index_name
     }
 
+    @classmethod
+    def _index_name_func_for(cls, index_name_frequency):
+        """ Returns the index name builder function associated with the given frequency
+
+        :param: index_name_frequency one of the IndexNameFrequency values
+        :return: The plain function building the index name, without the staticmethod wrapper
+        """
+        return cls._INDEX_FREQUENCY_FUNCION_DICT[index_name_frequency].__func__
+
+    # Epoch-bucket size after which the memoized index name must be recomputed.
+    #       MONTHLY/YEARLY only change on day boundaries at most, so a daily bucket
+    #       is enough; NO_FREQ (0) means the name is constant and cached at init.
+    _INDEX_FREQUENCY_BUCKET_SECONDS = {
+        IndexNameFrequency.NO_FREQ: 0,
+        IndexNameFrequency.DAILY: 86400,
+        IndexNameFrequency.WEEKLY: 86400,
+        IndexNameFrequency.MONTHLY: 86400,
+        IndexNameFrequency.YEARLY: 86400
+    }
+
     def __init__(self,
                  hosts: Iterable[Dict[str, Any]] = __DEFAULT_ELASTICSEARCH_HOST,
                  auth_details=(__DEFAULT_AUTH_USER, __DEFAULT_AUTH_PASSWD),
@@ -157,6 +243,8 @@ class ESHandler(logging.Handler):
                  raise_on_indexing_exceptions: bool = __DEFAULT_RAISE_ON_EXCEPTION,
                  default_timestamp_field_name: str = __DEFAULT_TIMESTAMP_FIELD_NAME,
                  timed_flush: bool = False,
+                 use_async_transport: bool = False,
+                 local_buffer_size: int = __DEFAULT_LOCAL_BUFFER_SIZE,
                  error_stream: TextIO = sys.stderr,
                  **kwargs, ):
         """ Handler constructor
@@ -194,6 +282,13 @@ class ESHandler(logging.Handler):
                     caused when
         :param timed_flush: A boolean, will perform flushing on an independent thread every flush_frequency_in_sec secs
                             regardless if the buffer size is full or not
+        :param use_async_transport: A boolean, when True bulk requests are sent through an AsyncElasticsearch client
+                            driven by a dedicated event-loop thread, so several bulks can be in flight concurrently
+                            and flush() never blocks on the HTTP round-trip. Requires \"elasticsearch[async]\"
+        :param local_buffer_size: An int, when positive every emitting thread stages up to this many records
+                            in a thread-local list before spilling them into the shared buffer in one batch,
+                            amortizing the shared-buffer traffic across records at the cost of a small
+                            delivery delay (staged records are picked up by the next flush). 0 disables staging
 
         :param kwargs: any additional arguments will be passed on to the
             :class:`~elasticsearch.Elasticsearch` class and, subsequently, to the
@@ -222,80 +317,210 @@ class ESHandler(logging.Handler):
         else:
             self.es_additional_fields = es_additional_fields.copy()
 
-        host = socket.gethostname()
-        if platform.system() != 'Darwin':
-            try:
-                host_ip = socket.gethostbyname(host)
-            except Exception as err:
-                if err.errno == 8:
-                    host_ip = '127.0.0.1'
-                else:
-                    raise err
-        else:
-            host_ip = '127.0.0.1'
+        host, host_ip = _resolve_host()
         self.es_additional_fields.update({'host': host,
                                           'host_ip': host_ip})
+        # Template the per-record dict off the (now complete) additional fields, so emit()
+        #       can build each record with a single dict-unpack instead of a .copy() call
+        self._base_template = self.es_additional_fields
 
         self.raise_on_indexing_exceptions = raise_on_indexing_exceptions
         self.default_timestamp_field_name = default_timestamp_field_name
         self._timed_flush = timed_flush
         self._error_stream = error_stream
 
+        self._use_async_transport = use_async_transport
+        self._async_client = None
+        self._async_loop = None
+        self._async_loop_thread = None
+        self._async_semaphore = None
+        if use_async_transport:
+            if not ASYNC_TRANSPORT_SUPPORTED:
+                raise EnvironmentError("Async client not available. Please install \"elasticsearch[async]\"")
+            if auth_type not in (ESHandler.AuthType.NO_AUTH, ESHandler.AuthType.BASIC_AUTH):
+                # fail fast here: raising later from the loop thread would only get
+                #       reported, re-queued and retried forever
+                raise ValueError("Authentication method not supported with the async transport")
+            self._async_loop = asyncio.new_event_loop()
+            self._async_pending = collections.deque()
+            # Futures of the scheduled bulks, so close() can block until they land
+            self._async_futures = collections.deque()
+            self._async_loop_thread = Thread(target=self._async_loop.run_forever, daemon=True)
+            self._async_loop_thread.start()
+
         self._client = None
-        self._buffer = []
+        # deque.append is atomic under the GIL, so producers never contend on a lock;
+        #       the lock is only needed to swap the whole buffer out in flush().
+        #       The capacity bounds memory when ES is unreachable: once full, the deque
+        #       evicts the oldest record (leaky bucket) instead of growing without limit
+        self._buffer_capacity = self.buffer_size * 4
+        self._buffer = collections.deque(maxlen=self._buffer_capacity)
+        self._dropped = 0
         self._buffer_lock = Lock()
-        self._timer = None
-        self._index_name_func = ESHandler._INDEX_FREQUENCY_FUNCION_DICT[self.index_name_frequency]
+        self._local_buffer_size = local_buffer_size
+        self._tls = local()
+        # Registry of (owning thread, staging list) pairs, so flush() can drain them
+        #       all and prune the entries whose thread has exited
+        self._staging_buffers = []
+        self._staging_lock = Lock()
+        self._flush_cv = Condition()
+        self._flusher = None
+        self._flush_requested = False
+        self._stopped = False
+        # Bind the plain function once so call sites skip the staticmethod .__func__ indirection
+        self._index_name_func = ESHandler._index_name_func_for(self.index_name_frequency)
+        self._index_bucket_seconds = ESHandler._INDEX_FREQUENCY_BUCKET_SECONDS[self.index_name_frequency]
+        self._ts_cache = (0, "")
+        if self._index_bucket_seconds:
+            self._cached_index = (0, "")
+        else:
+            self._cached_index = (0, self.es_index_name)
+        self._header_cache = ("", b"")
         self.serializer = ESSerializer()
         # Next filter is needed as elasticsearch.bulk function calls logging.info in its http_requests module,
         #       and creates an infinite loop of logging.
         self.addFilter(self.es_filter)
 
-    def _schedule_flush(self) -> None:
-        if self._timer is None:
-            self._timer = Timer(self.flush_frequency_in_sec, self.flush)
-            self._timer.setDaemon(True)
-            self._timer.start()
+    def _ensure_flusher(self) -> None:
+        # A single long-lived daemon thread replaces the Timer-per-flush scheme,
+        #       so no thread is spawned on the emit/flush path
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._flush_cv:
+                if (self._flusher is None or not self._flusher.is_alive()) and not self._stopped:
+                    self._flusher = Thread(target=self._flush_loop, daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped:
+            with self._flush_cv:
+                if not self._flush_requested:
+                    self._flush_cv.wait(timeout=self.flush_frequency_in_sec)
+                self._flush_requested = False
+            if self._stopped:
+                break
+            try:
+                self.flush()
+            except Exception:
+                # flush() already re-queued the batch; raising here has no caller to
+                #       reach and would kill this thread, stopping delivery for good
+                traceback.print_exc(file=self._error_stream)
+
+    def _client_cache_key(self) -> Optional[tuple]:
+        """ Returns the hashable connection identity of this handler, or None when not cacheable """
+        if self.auth_type == ESHandler.AuthType.KERBEROS_AUTH:
+            # Kerberos clients must not outlive their tokens, so they stay per handler
+            return None
+        try:
+            # hosts may also be plain 'host:port' strings, which the client accepts
+            hosts_key = tuple(sorted(tuple(sorted(host.items())) if isinstance(host, dict) else host
+                                     for host in self.hosts))
+            return (hosts_key,
+                    self.auth_type,
+                    tuple(self.auth_details),
+                    self.aws_access_key,
+                    self.aws_secret_key,
+                    self.aws_region,
+                    frozenset(self.kwargs.items()))
+        except (TypeError, AttributeError):
+            # hosts or kwargs that cannot be hashed or normalized: fall back to a
+            #       per-handler client instead of failing the logging call
+            return None
 
     def _get_es_client(self) -> Elasticsearch:
-        if self._client is None:
+        if self._client is not None:
+            return self._client
+
+        cache_key = self._client_cache_key()
+        if cache_key is not None:
+            client = _CLIENT_CACHE.get(cache_key)
+            if client is not None:
+                self._client = client
+                return client
+
+        if self.auth_type == ESHandler.AuthType.NO_AUTH:
+            client = Elasticsearch(hosts=self.hosts,
+                                   serializer=self.serializer,
+                                   **self.kwargs)
+        elif self.auth_type == ESHandler.AuthType.BASIC_AUTH:
+            client = Elasticsearch(hosts=self.hosts,
+                                   http_auth=self.auth_details,
+                                   serializer=self.serializer,
+                                   **self.kwargs
+                                   )
+
+        elif self.auth_type == ESHandler.AuthType.KERBEROS_AUTH:
+            if not KERBEROS_SUPPORTED:
+                raise EnvironmentError("Kerberos module not available. Please install \"requests-kerberos\"")
+            # For kerberos we return a new client each time to make sure the tokens are up to date
+            client = Elasticsearch(hosts=self.hosts,
+                                   connection_class=RequestsHttpConnection,
+                                   http_auth=HTTPKerberosAuth(mutual_authentication=DISABLED),
+                                   serializer=self.serializer,
+                                   **self.kwargs)
+
+        elif self.auth_type == ESHandler.AuthType.AWS_SIGNED_AUTH:
+            if not AWS4AUTH_SUPPORTED:
+                raise EnvironmentError("AWS4Auth not available. Please install \"requests-aws4auth\"")
+            awsauth = AWS4Auth(self.aws_access_key, self.aws_secret_key, self.aws_region, 'es')
+            client = Elasticsearch(
+                hosts=self.hosts,
+                http_auth=awsauth,
+                verify_certs=True,
+                connection_class=RequestsHttpConnection,
+                serializer=self.serializer,
+                **self.kwargs
+            )
+        else:
+            raise ValueError("Authentication method not supported")
+
+        if cache_key is not None:
+            _CLIENT_CACHE[cache_key] = client
+        self._client = client
+        return client
+
+    def _get_async_es_client(self) -> "AsyncElasticsearch":
+        if self._async_client is None:
             if self.auth_type == ESHandler.AuthType.NO_AUTH:
-                self._client = Elasticsearch(hosts=self.hosts,
-                                             serializer=self.serializer,
-                                             **self.kwargs)
+                self._async_client = AsyncElasticsearch(hosts=self.hosts,
+                                                        serializer=self.serializer,
+                                                        **self.kwargs)
             elif self.auth_type == ESHandler.AuthType.BASIC_AUTH:
-                self._client = Elasticsearch(hosts=self.hosts,
-                                             http_auth=self.auth_details,
-                                             serializer=self.serializer,
-                                             **self.kwargs
-                                             )
-
-            elif self.auth_type == ESHandler.AuthType.KERBEROS_AUTH:
-                if not KERBEROS_SUPPORTED:
-                    raise EnvironmentError("Kerberos module not available. Please install \"requests-kerberos\"")
-                # For kerberos we return a new client each time to make sure the tokens are up to date
-                self._client = Elasticsearch(hosts=self.hosts,
-                                             connection_class=RequestsHttpConnection,
-                                             http_auth=HTTPKerberosAuth(mutual_authentication=DISABLED),
-                                             serializer=self.serializer,
-                                             **self.kwargs)
-
-            elif self.auth_type == ESHandler.AuthType.AWS_SIGNED_AUTH:
-                if not AWS4AUTH_SUPPORTED:
-                    raise EnvironmentError("AWS4Auth not available. Please install \"requests-aws4auth\"")
-                awsauth = AWS4Auth(self.aws_access_key, self.aws_secret_key, self.aws_region, 'es')
-                self._client = Elasticsearch(
-                    hosts=self.hosts,
-                    http_auth=awsauth,
-                    verify_certs=True,
-                    connection_class=RequestsHttpConnection,
-                    serializer=self.serializer,
-                    **self.kwargs
-                )
+                self._async_client = AsyncElasticsearch(hosts=self.hosts,
+                                                        http_auth=self.auth_details,
+                                                        serializer=self.serializer,
+                                                        **self.kwargs)
             else:
-                raise ValueError("Authentication method not supported")
-
-        return self._client
+                raise ValueError("Authentication method not supported with the async transport")
+
+        return self._async_client
+
+    async def _async_bulk_flush(self, payloads: list) -> None:
+        # The semaphore caps how many bulk requests can be in flight concurrently,
+        #       so a slow cluster cannot accumulate an unbounded number of pending POSTs
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(ESHandler.__DEFAULT_MAX_INFLIGHT_BULKS)
+        self._async_pending.append(payloads)
+        async with self._async_semaphore:
+            # Coalesce every batch queued while this coroutine waited for a submission
+            #       slot into a single bulk request, amortizing one HTTP round-trip
+            #       across them (only the loop thread touches _async_pending)
+            pending = self._async_pending
+            if not pending:
+                return
+            batch = []
+            while pending:
+                batch.extend(pending.popleft())
+            header = self._current_action_header()
+            body = b''.join(header + payload + b'\n' for payload in batch)
+            try:
+                response = await self._get_async_es_client().bulk(body=body)
+                if response.get('errors'):
+                    raise eshelpers.BulkIndexError("bulk indexing reported errors", response)
+            except Exception:
+                # Exceptions cannot propagate to the emitting thread from here; report and
+                #       put the records back so the next flush retries them
+                self._requeue(batch)
+                traceback.print_exc(file=self._error_stream)
 
     def create_index_with_mapping(self, mapping: Dict[str, Any]) -> None:
         """Create an index with specified mapping if there is no other index with specified name."""
@@ -317,71 +542,289 @@ class ESHandler(logging.Handler):
         """
         return self._get_es_client().ping()
 
-    @staticmethod
-    def _get_es_datetime_str(timestamp: int) -> str:
+    def _current_index_name(self) -> str:
+        """ Returns the elasticsearch index name for the current point in time
+
+        The computed name is memoized per epoch bucket so strftime runs at most
+        once per bucket roll instead of once per flush.
+        """
+        bucket_seconds = self._index_bucket_seconds
+        if bucket_seconds:
+            bucket = int(time.time()) // bucket_seconds
+            if bucket != self._cached_index[0]:
+                self._cached_index = (bucket, self._index_name_func(self.es_index_name))
+        return self._cached_index[1]
+
+    def _current_action_header(self) -> bytes:
+        """ Returns the pre-serialized NDJSON action line shared by every record in a bulk
+
+        The index name and doc type only change when the memoized index name rolls,
+        so the header bytes are cached instead of being serialized per record.
+        """
+        index_name = self._current_index_name()
+        if index_name != self._header_cache[0]:
+            header = self.serializer.dumps({'index': {'_index': index_name, '_type': self.es_doc_type}})
+            self._header_cache = (index_name, header.encode('utf-8') + b'\n')
+        return self._header_cache[1]
+
+    def _get_es_datetime_str(self, timestamp: float) -> str:
         """ Returns elasticsearch utc formatted time for an epoch timestamp
+
+        The second-resolution prefix is memoized, so for bursty loggers strftime runs
+        once per second instead of once per record; only the milliseconds differ.
         :return: A string valid for elasticsearch time record
         """
-        current_date = datetime.datetime.utcfromtimestamp(timestamp)
-        return "{0!s}.{1:03d}Z".format(current_date.strftime('%Y-%m-%dT%H:%M:%S'), int(current_date.microsecond / 1000))
+        sec = int(timestamp)
+        # read the cache tuple once: re-reading self._ts_cache after the check could
+        #       pick up a concurrent emitter's entry for a different second
+        cached = self._ts_cache
+        if sec != cached[0]:
+            cached = (sec, datetime.datetime.utcfromtimestamp(sec).strftime('%Y-%m-%dT%H:%M:%S'))
+            self._ts_cache = cached
+        return f"{cached[1]}.{int((timestamp - sec) * 1000):03d}Z"
+
+    def _requeue(self, logs_buffer) -> None:
+        """ Puts a failed batch back in front of newly emitted records so the next flush retries it
+
+        The re-queue happens in place on the live deque (never swapping the buffer object,
+        which would race concurrent emitters) and stays within the capacity bound; records
+        evicted to make room are accounted as dropped.
+        """
+        with self._buffer_lock:
+            overflow = len(self._buffer) + len(logs_buffer) - self._buffer_capacity
+            if overflow > 0:
+                self._dropped += overflow
+            self._buffer.extendleft(reversed(logs_buffer))
+
+    def _overflow_record(self, dropped: int) -> bytes:
+        """ Returns a synthetic serialized record reporting how many records the buffer evicted """
+        rec = {**self._base_template}
+        rec['levelname'] = 'WARNING'
+        rec['message'] = "eslogging buffer overflowed: {0:d} records were dropped".format(dropped)
+        rec[self.default_timestamp_field_name] = self._get_es_datetime_str(time.time())
+        return self.serializer.dumps(rec).encode('utf-8')
 
     def flush(self) -> None:
-        if self._timer is not None and self._timer.is_alive():
-            self._timer.cancel()
-        self._timer = None
-
+        if self._local_buffer_size:
+            self._drain_staging()
         if self._buffer:
+            # Handler.handle serializes emit under the handler's own self.lock, so
+            #       holding it across the swap means no emitter can still be inside
+            #       emit with a reference to the old deque: every record is either
+            #       appended before the swap (and drained below) or lands on the
+            #       fresh buffer. The lock is released before any network I/O
+            self.acquire()
             try:
                 with self._buffer_lock:
-                    logs_buffer = self._buffer
-                    actions = (
-                        {
-                            '_index': self._index_name_func.__func__(self.es_index_name),
-                            '_type': self.es_doc_type,
-                            '_source': log_record
-                        }
-                        for log_record in logs_buffer
-                    )
-                    eshelpers.bulk(
-                        client=self._get_es_client(),
-                        actions=actions,
-                        stats_only=True
-                    )
-                    self._buffer = []
+                    logs_buffer, self._buffer = self._buffer, collections.deque(maxlen=self._buffer_capacity)
+                    dropped, self._dropped = self._dropped, 0
+            finally:
+                self.release()
+            # drain with popleft() rather than iterating, so even a direct emit()
+            #       caller bypassing handle()'s lock cannot crash the join mid-iteration
+            batch = []
+            while True:
+                try:
+                    batch.append(logs_buffer.popleft())
+                except IndexError:
+                    break
+            if dropped:
+                batch.append(self._overflow_record(dropped))
+            if not batch:
+                return
+            if self._use_async_transport:
+                loop = self._async_loop
+                if loop is None:
+                    # the transport was already torn down; keep the batch for a retry
+                    self._requeue(batch)
+                    return
+                while self._async_futures and self._async_futures[0].done():
+                    self._async_futures.popleft()
+                future = asyncio.run_coroutine_threadsafe(self._async_bulk_flush(batch), loop)
+                self._async_futures.append(future)
+                return
+            try:
+                # The action header is identical for every record of the batch and the
+                #       sources were already serialized at emit time, so the bulk body
+                #       is a plain join of bytes
+                header = self._current_action_header()
+                body = b''.join(
+                    header + payload + b'\n'
+                    for payload in batch
+                )
+                response = self._get_es_client().bulk(body=body)
+                if response.get('errors'):
+                    raise eshelpers.BulkIndexError("bulk indexing reported errors", response)
             except Exception as exception:
+                self._requeue(batch)
                 if self.raise_on_indexing_exceptions:
                     raise exception
                 else:
+                    # The flusher thread will retry the re-queued records on its next cycle
                     traceback.print_exc(file=self._error_stream)
-                    self._schedule_flush()
 
     def close(self) -> None:
         """ Flushes the buffer and release any outstanding resource"""
-        if self._timer is not None:
-            self.flush()
-        self._timer = None
+        self._stopped = True
+        with self._flush_cv:
+            self._flush_cv.notify()
+        self.flush()
+        if self._use_async_transport:
+            self._shutdown_async_transport()
+
+    def _shutdown_async_transport(self, timeout: float = 10.0) -> None:
+        """ Blocks until every scheduled bulk has completed, then tears the loop down
+
+        close() must uphold the flush-on-close guarantee: without waiting here the
+        last records would still be in flight on the daemon loop thread when
+        logging.shutdown() returns and the interpreter exits with them.
+        """
+        loop, self._async_loop = self._async_loop, None
+        if loop is None:
+            return
+        while self._async_futures:
+            future = self._async_futures.popleft()
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                # _async_bulk_flush reports and re-queues its own failures; anything
+                #       surfacing here (e.g. a timeout) is only worth reporting
+                traceback.print_exc(file=self._error_stream)
+        client, self._async_client = self._async_client, None
+        if client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(client.close(), loop).result(timeout=timeout)
+            except Exception:
+                traceback.print_exc(file=self._error_stream)
+        loop.call_soon_threadsafe(loop.stop)
+        if self._async_loop_thread is not None:
+            self._async_loop_thread.join(timeout=timeout)
+            self._async_loop_thread = None
+        loop.close()
+
+    def _enqueue(self, rec: Dict[str, Any], record: logging.LogRecord) -> None:
+        # Serialize here and buffer the NDJSON source bytes: the record is walked once,
+        #       and flush() only has to join bytes instead of re-serializing every dict
+        try:
+            payload = self.serializer.dumps(rec).encode('utf-8')
+        except Exception:
+            # serializing at emit time moved this failure from flush() into the
+            #       application's logging call, which must never see it raise on the
+            #       default configuration; follow the stdlib handler convention
+            if self.raise_on_indexing_exceptions:
+                raise
+            self.handleError(record)
+            return
+        if self._local_buffer_size:
+            staging = getattr(self._tls, 'buf', None)
+            if staging is None:
+                staging = self._tls.buf = []
+                with self._staging_lock:
+                    self._staging_buffers.append((current_thread(), staging))
+            staging.append(payload)
+            if len(staging) >= self._local_buffer_size:
+                self._spill(staging)
+            else:
+                # keep the flusher alive so staged records get drained on its next cycle
+                self._ensure_flusher()
+            return
+        buffer = self._buffer
+        if len(buffer) == self._buffer_capacity:
+            # the append below evicts the oldest record; account for it
+            self._dropped += 1
+        buffer.append(payload)
+        self._try_flush()
+
+    def _pop_staged(self, staging: list) -> list:
+        """ Consumes the staged records by popping from the front
+
+        Both the owning thread (_spill) and the flusher (_drain_staging) consume this
+        way: each pop removes exactly one record atomically, so a record can never be
+        delivered twice the way an extend-then-clear pair racing a drain could.
+        """
+        drained = []
+        while staging:
+            try:
+                drained.append(staging.pop(0))
+            except IndexError:
+                break
+        return drained
+
+    def _spill(self, staging: list) -> None:
+        drained = self._pop_staged(staging)
+        if drained:
+            with self._buffer_lock:
+                overflow = len(self._buffer) + len(drained) - self._buffer_capacity
+                if overflow > 0:
+                    self._dropped += overflow
+                self._buffer.extend(drained)
+        self._try_flush()
+
+    def _drain_staging(self) -> None:
+        with self._staging_lock:
+            staging_buffers = list(self._staging_buffers)
+        dead_entries = []
+        for entry in staging_buffers:
+            owner, staging = entry
+            drained = self._pop_staged(staging)
+            if drained:
+                with self._buffer_lock:
+                    overflow = len(self._buffer) + len(drained) - self._buffer_capacity
+                    if overflow > 0:
+                        self._dropped += overflow
+                    self._buffer.extend(drained)
+            # drain before the liveness check, so a thread that exited right after
+            #       its last append still gets its records delivered
+            if not owner.is_alive():
+                dead_entries.append(entry)
+        if dead_entries:
+            with self._staging_lock:
+                for entry in dead_entries:
+                    try:
+                        self._staging_buffers.remove(entry)
+                    except ValueError:
+                        pass
 
     def _try_flush(self) -> None:
+        self._ensure_flusher()
         if len(self._buffer) >= self.buffer_size and not self._timed_flush:
-            self.flush()
-        else:
-            self._schedule_flush()
+            # Wake the flusher thread instead of flushing inline, so emit never
+            #       performs network I/O itself
+            with self._flush_cv:
+                self._flush_requested = True
+                self._flush_cv.notify()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """ Handle overrides logging.Handler.handle with a cheap level fast path
+
+        Logger.callHandlers checks the handler level itself, but direct handle()
+        callers such as QueueListener do not; rejecting below-level records here
+        avoids running the filter chain and emit for dead records.
+        """
+        if record.levelno < self.level:
+            return False
+        return logging.Handler.handle(self, record)
 
     def emit(self, record: logging.LogRecord) -> None:
         """ Emit overrides the abstract logging.Handler logRecord emit method
         Format and records the log
         """
-        rec = self.es_additional_fields.copy()
-        for key, value in record.__dict__.items():
-            if key not in ESHandler.__LOGGING_FILTER_FIELDS:
-                if key == "args":
-                    value = tuple(str(arg) for arg in value)
-                rec[key] = "" if value is None else value
+        rec = {**self._base_template}
+        rd = record.__dict__
+        for key in _LOGRECORD_COPY_KEYS:
+            value = rd.get(key)
+            rec[key] = "" if value is None else value
+        if len(rd) != _LOGRECORD_SCHEMA_LEN:
+            # fields attached through `extra=`: copy whatever is not part of the schema
+            schema = _LOGRECORD_SCHEMA
+            for key, value in rd.items():
+                if key not in schema:
+                    rec[key] = "" if value is None else value
+        # args are not serialised separately: getMessage() already interpolates them,
+        #       so a single formatted message replaces the per-arg str() tuple
+        rec['message'] = record.getMessage()
         rec[self.default_timestamp_field_name] = self._get_es_datetime_str(record.created)
-        with self._buffer_lock:
-            self._buffer.append(rec)
-
-        self._try_flush()
+        self._enqueue(rec, record)
 
 
 class ESHandlerIgnoreESLogs(ESHandler):
@@ -392,19 +835,20 @@ class ESHandlerIgnoreESLogs(ESHandler):
     """
 
     def _emit(self, record: logging.LogRecord):
-        rec = self.es_additional_fields.copy()
-        message = record.getMessage()
-        rec["msg"] = message
-        log_keys = ["levelname", "pathname", "lineno", "funcName", "threadName", "processName", "process"]
-        for key in log_keys:
-            v = getattr(record, key, None)
-            if v is not None:
-                rec[key] = str(v)
-        rec[self.default_timestamp_field_name] = self._get_es_datetime_str(record.created)
-        with self._buffer_lock:
-            self._buffer.append(rec)
-
-        self._try_flush()
+        rec = {**self._base_template}
+        rec["msg"] = record.getMessage()
+        # These LogRecord fields are always present, so plain dict reads replace the
+        #       seven getattr calls with defaults; values keep their native types
+        rd = record.__dict__
+        rec["levelname"] = rd["levelname"]
+        rec["pathname"] = rd["pathname"]
+        rec["lineno"] = rd["lineno"]
+        rec["funcName"] = rd["funcName"]
+        rec["threadName"] = rd["threadName"]
+        rec["processName"] = rd["processName"]
+        rec["process"] = rd["process"]
+        rec[self.default_timestamp_field_name] = self._get_es_datetime_str(rd["created"])
+        self._enqueue(rec, record)
 
     def emit(self, record: logging.LogRecord):
         if isinstance(record.msg, (dict, list, tuple)):